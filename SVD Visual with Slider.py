@@ -5,7 +5,9 @@ from __future__ import annotations
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.widgets import Slider
-from scipy.linalg import svd
+from scipy.sparse.linalg import svds
+
+from svd_base import SVDBase
 
 # --- Production Ready Styling ---
 try:
@@ -13,72 +15,76 @@ try:
 except:
     plt.style.use('bmh')
 
-class SVDZeroLab:
-    def __init__(self, size: int = 1000):
-        self.size = size
-        self.rng = np.random.default_rng(2026)
-        
-        # 1. High-Res Signal Generation
-        x = np.linspace(-5, 5, size)
-        X, Y = np.meshgrid(x, x)
-        self.L_clean = (np.sin(X*2) * np.exp(-X**2/4) * np.cos(Y*2) * np.exp(-Y**2/4))
-        
-        # 2. Additive White Gaussian Noise
-        self.sigma = 0.1
-        self.A_noisy = self.L_clean + self.sigma * self.rng.standard_normal((size, size))
-        
-        # 3. Spectral Decomposition
-        print(f"Decomposing {size}x{size} matrix...")
-        self.U, self.s, self.Vh = svd(self.A_noisy, full_matrices=False)
+class SVDZeroLab(SVDBase):
+    residual_mode = True  # the surface shows A_noisy minus the top components
 
+    def __init__(self, size: int = 1000, rank: int = 40):
+        print(f"Decomposing {size}x{size} matrix (rank {rank})...")
+        super().__init__(size, sigma=0.1, rank=rank)
+        self.rank = len(self.s)  # components actually computed (<= size)
+        
         # 4. Interface Setup
         self.fig = plt.figure(figsize=(16, 9))
         self.ax_3d = self.fig.add_subplot(1, 2, 1, projection='3d')
         self.ax_2d = self.fig.add_subplot(1, 2, 2)
+        self.ax_3d.set_zlim(-1, 1)
+        self.ax_3d.axis('off')
+        self.ax_3d.set_title("")  # text set per update
         
-        # Slider: 0 = Full Signal, 1000 = Total Zero
+        # Spectrum plot is static apart from the active segment, updated via set_data
+        self.ax_2d.semilogy(self.s, color='gray', alpha=0.2, label="Original Spectrum")
+        self._line_active, = self.ax_2d.semilogy([], [], 'b-', label="Active Components")
+        self.ax_2d.set_title("Remaining Spectral Energy")
+        self.ax_2d.set_ylabel("Magnitude (Log)")
+        self.ax_2d.legend()
+        
+        # Slider: 0 = Full Signal, rank = Noise Floor Only
         ax_slide = plt.axes([0.2, 0.05, 0.6, 0.03])
-        self.slider = Slider(ax_slide, 'Components to REMOVE', 0, size, valinit=0, valfmt='%d')
-        self.slider.on_changed(self.update)
+        self._connect_slider(Slider(ax_slide, 'Components to REMOVE', 0, self.rank, valinit=0, valfmt='%d'))
         
         self.update(0)
+        self._enable_blit([self.ax_3d.title, self._line_active])
+
+    def _make_signal(self) -> np.ndarray:
+        # 1. High-Res Signal Generation
+        # Separable: L[i, j] = g(y_i) * f(x_j), so only O(n) transcendentals
+        x = np.linspace(-5, 5, self.size)
+        envelope = np.exp(-x**2/4)
+        return np.outer(np.cos(x*2) * envelope, np.sin(x*2) * envelope)
+
+    def _decompose(self, rank: int):
+        # 3. Spectral Decomposition (ARPACK Lanczos, top 'rank' triplets only;
+        #    svds needs rank < size, so small matrices take the full SVD)
+        if rank >= min(self.A_noisy.shape):
+            return super()._decompose(rank)
+        U, s, Vh = svds(self.A_noisy, k=rank, random_state=self.rng)
+        order = np.argsort(-s)  # svds returns ascending singular values
+        return U[:, order], s[order], Vh[order]
 
     def update(self, val):
-        remove_count = int(self.slider.val)
+        remove_count = self._slider_rank()
+        if not self._rank_changed(remove_count):
+            return
         
-        # Logic: Zero out the top 'remove_count' singular values
-        s_modified = self.s.copy()
-        if remove_count > 0:
-            s_modified[:remove_count] = 0
-            
-        # Reconstruction from the remaining (weaker) components
-        A_k = (self.U * s_modified) @ self.Vh
+        # Logic: Subtract the top 'remove_count' components from the data,
+        # leaving the remaining (weaker) components
+        A_k = self._reconstruct(remove_count)
         
         # Plot 1: 3D Visualization (Strided for speed)
-        self.ax_3d.clear()
-        x_g, y_g = np.meshgrid(np.arange(0, self.size, 10), np.arange(0, self.size, 10))
-        # As you remove components, the surface will flatten towards Y=0
-        self.ax_3d.plot_surface(x_g, y_g, A_k[::10, ::10], cmap='viridis', antialiased=False)
-        self.ax_3d.set_zlim(-1, 1)
-        self.ax_3d.set_title(f"Surface with {remove_count} Components Zeroed")
-        self.ax_3d.axis('off')
+        # As you remove components the coherent signal disappears; at the
+        # slider maximum ('rank') only the noise floor remains, not a flat plane
+        self._update_surface(self.ax_3d, A_k, cmap='viridis')
+        self.ax_3d.title.set_text(f"Surface with {remove_count} Components Zeroed")
         
         # Plot 2: Spectral Residual
-        self.ax_2d.clear()
-        self.ax_2d.semilogy(self.s, color='gray', alpha=0.2, label="Original Spectrum")
-        if remove_count < self.size:
-            self.ax_2d.semilogy(range(remove_count, self.size), self.s[remove_count:], 
-                                'b-', label="Active Components")
-        
-        self.ax_2d.set_title("Remaining Spectral Energy")
-        self.ax_2d.set_ylabel("Magnitude (Log)")
-        self.ax_2d.legend()
+        self._line_active.set_data(range(remove_count, self.rank), self.s[remove_count:])
         
         # Terminal Feedback
-        current_norm = np.linalg.norm(A_k)
+        # |A - A_k|^2 = |A|^2 - sum_{i<k} s_i^2, precomputed per rank
+        current_norm = np.sqrt(self._err_sq[remove_count])
         print(f"Removed: {remove_count:4d} | Residual Matrix Norm: {current_norm:.4f}")
         
-        self.fig.canvas.draw_idle()
+        self._blit()
 
 if __name__ == "__main__":
     lab = SVDZeroLab()
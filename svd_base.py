@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+
+# Shared engine for the interactive SVD labs: signal + noise, truncated
+# decomposition, cached rank-k reconstructions, in-place 3D surface updates,
+# blitting and slider throttling. Each lab subclasses SVDBase and supplies
+# its signal, its decomposition (optional) and its figure layout.
+
+from __future__ import annotations
+from abc import ABC, abstractmethod
+import numpy as np
+from matplotlib.backend_bases import TimerBase
+from scipy.linalg import svd
+from scipy.linalg.blas import sgemm
+
+# Optional JIT for the rank-1 cache update (falls back to NumPy)
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit("void(f4[:, ::1], f4[:, ::1], f4[::1], f4[::1], f4)", parallel=True, fastmath=True)
+    def add_outer(out, C, u, v, s):
+        # out = C + s * outer(u, v), fused into one pass with no n x n temporary
+        for i in prange(u.shape[0]):
+            ui = s * u[i]
+            for j in range(v.shape[0]):
+                out[i, j] = C[i, j] + ui * v[j]
+else:
+    def add_outer(out, C, u, v, s):
+        np.multiply.outer(s * u, v, out=out)
+        np.add(out, C, out=out)
+
+def _surface_polys(X: np.ndarray, Y: np.ndarray, Z: np.ndarray) -> np.ndarray:
+    # One quad per grid cell, vertices in plot_surface order (rstride = cstride = 1)
+    P = np.stack([X, Y, Z], axis=-1)
+    quads = np.stack([P[:-1, :-1], P[:-1, 1:], P[1:, 1:], P[1:, :-1]], axis=-2)
+    return quads.reshape(-1, 4, 3)
+
+def _set_quad_z(polys: np.ndarray, Z: np.ndarray) -> None:
+    # Overwrite only the z column of a _surface_polys array, in place
+    q = polys.reshape(Z.shape[0] - 1, Z.shape[1] - 1, 4, 3)
+    q[:, :, 0, 2] = Z[:-1, :-1]
+    q[:, :, 1, 2] = Z[:-1, 1:]
+    q[:, :, 2, 2] = Z[1:, 1:]
+    q[:, :, 3, 2] = Z[1:, :-1]
+
+class SVDBase(ABC):
+    # Labs that display A_noisy - A_k (components removed) instead of A_k
+    residual_mode = False
+    # Rank-cache checkpoint spacing: every rank is at most this many
+    # components (one GEMM) away from a stored matrix
+    cache_every = 16
+
+    def __init__(self, size: int, sigma: float, rank: int | None = None):
+        self.size = size
+        self.rng = np.random.default_rng(2026)
+
+        # 1. Clean signal
+        self.L_clean = self._make_signal()
+
+        # 2. Additive White Gaussian Noise. Display-grade data: decompose and
+        #    reconstruct in single precision, keep the clean reference in double
+        self.sigma = sigma
+        self.A_noisy = self.L_clean + sigma * self.rng.standard_normal(self.L_clean.shape)
+        self.A_noisy = self.A_noisy.astype(np.float32, copy=False)
+
+        # 3. Decomposition, with the left factor pre-scaled once
+        #    (Fortran order so each column is contiguous)
+        self.U, self.s, self.Vh = self._decompose(rank)
+        self.US = np.asfortranarray(self.U * self.s)
+
+        # Per-rank metric tables, built once so update() only indexes them.
+        # Cumulative spectral energy in a single fp32 pass over s^2, relative
+        # to the total |A|_F^2 (not just the retained components, which
+        # would always reach 100% for a truncated decomposition)
+        a = self.A_noisy.ravel()
+        a2 = np.einsum('i,i', a, a, dtype=np.float64)
+        self.energy_cumulative = np.cumsum(self.s * self.s) / np.float32(a2)
+        # Squared errors via the spectral identity (float64 accumulation):
+        #   |L - A_k|^2 = |L|^2 - 2 sum_{i<k} s_i u_i^T L v_i + sum_{i<k} s_i^2
+        #   |A - A_k|^2 = |A|^2 - sum_{i<k} s_i^2            (residual mode)
+        s2 = np.concatenate(([0.0], np.cumsum(self.s.astype(np.float64)**2)))
+        if self.residual_mode:
+            self._err_sq = a2 - s2
+        else:
+            proj = np.einsum('ai,ai->i', self.U, self.L_clean @ self.Vh.T)
+            lv = np.concatenate(([0.0], np.cumsum(self.s * proj)))
+            self._err_sq = np.vdot(self.L_clean, self.L_clean) - 2 * lv + s2
+        np.maximum(self._err_sq, 0.0, out=self._err_sq)
+
+        # Lazily-filled rank cache: _cache[k] = sum_{i<k} s_i u_i v_i^T,
+        # or A_noisy minus that sum in residual mode. Only checkpoint ranks
+        # (multiples of cache_every) are kept, plus the most recent result,
+        # so memory stays at ~rank/cache_every matrices
+        self._cache = [None] * (len(self.s) + 1)
+        self._cache[0] = self.A_noisy if self.residual_mode else np.zeros_like(self.A_noisy)
+        self._recent = (0, self._cache[0])
+
+        # Strided sample grid (~64 points per axis regardless of size) and
+        # quad template, built once: only z changes per update
+        self.stride = max(1, self.size // 64)
+        xg = np.arange(0, self.size, self.stride, dtype=np.int32)
+        self.X_g, self.Y_g = np.meshgrid(xg, xg)
+        self._polys = _surface_polys(self.X_g, self.Y_g, np.zeros(self.X_g.shape))
+        self._surf = None  # Poly3DCollection, created once and mutated in place
+
+        self._bg = None  # cached static background for blitting
+        self._last_k = -1
+        self._pending = False
+
+    @abstractmethod
+    def _make_signal(self) -> np.ndarray:
+        ...
+
+    def _decompose(self, rank: int | None):
+        # Full thin SVD (single precision -> sgesdd), exact and so the optimal
+        # truncation; keep the top 'rank' triplets (all if rank is None)
+        U, s, Vh = svd(self.A_noisy, full_matrices=False, lapack_driver='gesdd')
+        return U[:, :rank], s[:rank], Vh[:rank]
+
+    def _reconstruct(self, k: int) -> np.ndarray:
+        # Extend from the highest stored rank <= k (checkpoint or most recent):
+        # a fused rank-1 update for a single step, one GEMM on the pre-scaled
+        # factor for a jump
+        sign = -1.0 if self.residual_mode else 1.0
+        j = k - k % self.cache_every
+        while self._cache[j] is None:
+            j -= self.cache_every
+        base = self._cache[j]
+        if j < self._recent[0] <= k:
+            j, base = self._recent
+        if k == j:
+            out = base
+        elif k - j == 1:
+            out = np.empty_like(base)
+            add_outer(out, base, self.US[:, j], np.ascontiguousarray(self.Vh[j, :]), sign)
+        else:
+            # out^T = out^T +/- Vh^T US^T: the C-ordered copy viewed as Fortran
+            # order, accumulated in place by BLAS (beta = 1, no product temporary).
+            # Use the returned array: f2py silently copies c if it cannot be
+            # updated in place
+            out = sgemm(sign, self.Vh[j:k, :].T, self.US[:, j:k], beta=1.0, c=base.copy().T,
+                        trans_b=True, overwrite_c=True).T
+        if k % self.cache_every == 0:
+            self._cache[k] = out
+        self._recent = (k, out)
+        return out
+
+    def _mse(self, k: int) -> float:
+        # Mean squared error of the rank-k view: against L_clean, or the
+        # residual's own energy in residual mode
+        return self._err_sq[k] / self.A_noisy.size
+
+    def _update_surface(self, ax, A_k: np.ndarray, **kwargs) -> None:
+        Z = A_k[::self.stride, ::self.stride]
+        if self._surf is None:
+            # Interactive surface: no per-edge anti-aliasing, rasterized in
+            # vector output; the data is already strided, so r/cstride = 1
+            kwargs = {'antialiased': False, 'rasterized': True, **kwargs}
+            self._surf = ax.plot_surface(self.X_g, self.Y_g, Z, rstride=1, cstride=1, **kwargs)
+        else:
+            _set_quad_z(self._polys, Z)
+            self._surf.set_verts(self._polys)
+            self._surf.set_array(self._polys[..., 2].mean(axis=-1))
+            self._surf.autoscale()
+
+    def _connect_slider(self, slider) -> None:
+        # Throttle: drag events within 30 ms collapse into one update, and
+        # ticks that stay on the same integer rank skip the reconstruction
+        self.slider = slider
+        slider.on_changed(self._on_slider)
+        self._timer = self.fig.canvas.new_timer(interval=30)
+        if type(self._timer) is TimerBase:  # non-GUI backend: timers never fire
+            self._timer = None
+        else:
+            self._timer.single_shot = True
+            self._timer.add_callback(self._flush)
+
+    def _on_slider(self, val):
+        # Coalesce drag events: at most one update per timer interval
+        if self._timer is None:
+            self.update(val)
+        elif not self._pending:
+            self._pending = True
+            self._timer.start()
+
+    def _flush(self):
+        self._pending = False
+        self.update(self.slider.val)
+
+    def _slider_rank(self) -> int:
+        # Integer slider position within its range (Slider.set_val does not
+        # clamp, and the range is capped to the computed components)
+        return int(min(max(self.slider.val, self.slider.valmin), self.slider.valmax))
+
+    def _rank_changed(self, k: int) -> bool:
+        # False (after re-blitting the moved slider handle) if k is unchanged
+        if k == self._last_k:
+            self._blit()
+            return False
+        self._last_k = k
+        return True
+
+    def _enable_blit(self, artists) -> None:
+        # Blitting: only the artists that change are redrawn on slider ticks,
+        # over a background captured on each full draw
+        self._animated = [self._surf, *artists, self.slider.ax]
+        self._canvas = self.fig.canvas  # the interactive canvas being blitted
+        if self._canvas.supports_blit:
+            self._set_animated(True)
+            self.slider.drawon = False
+            self._canvas.mpl_connect('draw_event', self._on_draw)
+            # Exports must draw the animated artists too (Figure.draw skips them)
+            self._fig_savefig = self.fig.savefig
+            self.fig.savefig = self._savefig
+
+    def _set_animated(self, value: bool) -> None:
+        for artist in self._animated:
+            artist.set_animated(value)
+
+    def _savefig(self, *args, **kwargs):
+        self._set_animated(False)
+        try:
+            return self._fig_savefig(*args, **kwargs)
+        finally:
+            self._set_animated(True)
+            # The save may have left the renderer at another dpi: force a
+            # full on-screen redraw (and background capture) before blitting
+            self._bg = None
+            self._canvas.draw_idle()
+
+    def _on_draw(self, event):
+        # Full on-screen redraw (first show, resize, 3D rotation): re-capture
+        # the static background, then paint the animated artists over it.
+        # Draws made while saving (possibly on a swapped-in vector canvas)
+        # are ignored
+        if event.canvas is not self._canvas or self._canvas.is_saving():
+            return
+        self._bg = self._canvas.copy_from_bbox(self.fig.bbox)
+        self._draw_animated()
+
+    def _draw_animated(self):
+        self._surf.do_3d_projection()  # new vertices -> new 2D paths and colours
+        for artist in self._animated:
+            self.fig.draw_artist(artist)
+
+    def _blit(self):
+        if self._bg is None:
+            self.fig.canvas.draw_idle()
+            return
+        self.fig.canvas.restore_region(self._bg)
+        self._draw_animated()
+        self.fig.canvas.blit(self.fig.bbox)
+
+    @abstractmethod
+    def update(self, val):
+        ...